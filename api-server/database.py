@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime
+from sqlalchemy import create_engine, event, text, Column, Integer, String, Float, DateTime
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
@@ -6,6 +6,15 @@ from datetime import datetime
 DATABASE_URL = "sqlite:///./greenml.db"
 
 engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+
+@event.listens_for(engine, "connect")
+def set_sqlite_pragma(dbapi_connection, connection_record):
+    # WAL lets readers run alongside the writer; NORMAL skips the fsync per commit
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -24,10 +33,15 @@ class MLJob(Base):
     predicted_carbon_kg = Column(Float)
     greenest_region = Column(String)
     potential_savings_kg = Column(Float)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
 
 Base.metadata.create_all(bind=engine)
 
+# create_all skips tables that already exist, so add the created_at index
+# to databases created before it was declared
+with engine.begin() as conn:
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_ml_jobs_created_at ON ml_jobs (created_at)"))
+
 def get_db():
     db = SessionLocal()
     try:
@@ -1,19 +1,28 @@
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List, Optional
+from sqlalchemy import func, select
+from typing import Dict, List, Optional
+from contextlib import asynccontextmanager
 from datetime import datetime
-import uuid
+import json
+import secrets
 
 from database import get_db, MLJob
-from predict import predict_carbon, find_greenest_region, REGION_CARBON
+from predict import find_greenest_region, cache_info, load_models, REGION_CARBON, REGIONS
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load and warm the model before accepting traffic
+    load_models()
+    yield
 
 app = FastAPI(
     title="GreenML Optimizer API",
     description="Carbon prediction and optimization for ML workloads",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS
@@ -42,7 +51,7 @@ class JobResponse(BaseModel):
     greenest_region: str
     potential_savings_kg: float
     savings_percentage: float
-    carbon_by_region: dict
+    carbon_by_region: Dict[str, float]
     timestamp: datetime
 
 class StatsResponse(BaseModel):
@@ -50,33 +59,55 @@ class StatsResponse(BaseModel):
     total_carbon_predicted_kg: float
     total_potential_savings_kg: float
     average_savings_percentage: float
-    jobs_by_region: dict
-    jobs_by_model: dict
+    jobs_by_region: Dict[str, int]
+    jobs_by_model: Dict[str, int]
+
+# Accepted inputs for /predict
+_models = ['ResNet50', 'BERT-Base', 'GPT-2', 'ViT', 'YOLO', 'CNN-Small']
+_gpus = ['T4', 'V100', 'A100']
+
+VALID_MODELS = frozenset(_models)
+VALID_GPUS = frozenset(_gpus)
+VALID_REGIONS = frozenset(REGIONS)
+
+INVALID_MODEL_MSG = f"Invalid model_type. Must be one of: {_models}"
+INVALID_GPU_MSG = f"Invalid gpu_type. Must be one of: {_gpus}"
+INVALID_REGION_MSG = f"Invalid region. Must be one of: {REGIONS}"
+
+# Static payloads, serialized once at import with JSONResponse's settings
+def _encode_json(content):
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+ROOT_JSON = _encode_json({
+    "message": "GreenML Optimizer API",
+    "version": "1.0.0",
+    "docs": "/docs",
+    "endpoints": {
+        "predict": "/predict",
+        "jobs": "/jobs",
+        "stats": "/stats",
+        "regions": "/regions"
+    }
+})
+
+REGIONS_JSON = _encode_json({
+    "regions": [
+        {"name": region, "carbon_intensity": intensity, "unit": "kg CO2/kWh"}
+        for region, intensity in REGION_CARBON.items()
+    ]
+})
+
+HEALTH_JSON = _encode_json({"status": "healthy", "service": "GreenML Optimizer API"})
 
 # Routes
 @app.get("/")
-def root():
-    return {
-        "message": "GreenML Optimizer API",
-        "version": "1.0.0",
-        "docs": "/docs",
-        "endpoints": {
-            "predict": "/predict",
-            "jobs": "/jobs",
-            "stats": "/stats",
-            "regions": "/regions"
-        }
-    }
+async def root():
+    return Response(content=ROOT_JSON, media_type="application/json")
 
 @app.get("/regions")
-def get_regions():
+async def get_regions():
     """Get available regions and their carbon intensity"""
-    return {
-        "regions": [
-            {"name": region, "carbon_intensity": intensity, "unit": "kg CO2/kWh"}
-            for region, intensity in REGION_CARBON.items()
-        ]
-    }
+    return Response(content=REGIONS_JSON, media_type="application/json")
 
 @app.post("/predict", response_model=JobResponse)
 def predict_job(job: JobRequest, db: Session = Depends(get_db)):
@@ -84,29 +115,14 @@ def predict_job(job: JobRequest, db: Session = Depends(get_db)):
     Predict carbon emissions for an ML job and find optimization opportunities
     """
     # Validate inputs
-    valid_models = ['ResNet50', 'BERT-Base', 'GPT-2', 'ViT', 'YOLO', 'CNN-Small']
-    valid_gpus = ['T4', 'V100', 'A100']
-    valid_regions = list(REGION_CARBON.keys())
-    
-    if job.model_type not in valid_models:
-        raise HTTPException(status_code=400, detail=f"Invalid model_type. Must be one of: {valid_models}")
-    if job.gpu_type not in valid_gpus:
-        raise HTTPException(status_code=400, detail=f"Invalid gpu_type. Must be one of: {valid_gpus}")
-    if job.region not in valid_regions:
-        raise HTTPException(status_code=400, detail=f"Invalid region. Must be one of: {valid_regions}")
+    if job.model_type not in VALID_MODELS:
+        raise HTTPException(status_code=400, detail=INVALID_MODEL_MSG)
+    if job.gpu_type not in VALID_GPUS:
+        raise HTTPException(status_code=400, detail=INVALID_GPU_MSG)
+    if job.region not in VALID_REGIONS:
+        raise HTTPException(status_code=400, detail=INVALID_REGION_MSG)
     
-    # Predict carbon for requested configuration
-    predicted_carbon = predict_carbon(
-        model_type=job.model_type,
-        batch_size=job.batch_size,
-        dataset_size_gb=job.dataset_size_gb,
-        gpu_count=job.gpu_count,
-        gpu_type=job.gpu_type,
-        duration_hours=job.duration_hours,
-        region=job.region
-    )
-    
-    # Find greenest region
+    # Predict carbon for every region in one pass
     greenest_region, carbon_by_region = find_greenest_region(
         model_type=job.model_type,
         batch_size=job.batch_size,
@@ -115,6 +131,7 @@ def predict_job(job: JobRequest, db: Session = Depends(get_db)):
         gpu_type=job.gpu_type,
         duration_hours=job.duration_hours
     )
+    predicted_carbon = carbon_by_region[job.region]
     
     # Calculate savings
     greenest_carbon = carbon_by_region[greenest_region]
@@ -122,7 +139,7 @@ def predict_job(job: JobRequest, db: Session = Depends(get_db)):
     savings_percentage = (potential_savings / predicted_carbon * 100) if predicted_carbon > 0 else 0
     
     # Save to database
-    job_id = f"job-{uuid.uuid4().hex[:8]}"
+    job_id = "job-" + secrets.token_hex(4)
     db_job = MLJob(
         job_id=job_id,
         model_type=job.model_type,
@@ -154,42 +171,53 @@ def predict_job(job: JobRequest, db: Session = Depends(get_db)):
 @app.get("/jobs", response_model=List[JobResponse])
 def list_jobs(limit: int = 100, db: Session = Depends(get_db)):
     """Get all jobs"""
-    jobs = db.query(MLJob).order_by(MLJob.created_at.desc()).limit(limit).all()
+    jobs = db.execute(
+        select(
+            MLJob.job_id,
+            MLJob.predicted_carbon_kg,
+            MLJob.region,
+            MLJob.greenest_region,
+            MLJob.potential_savings_kg,
+            MLJob.created_at
+        ).order_by(MLJob.created_at.desc()).limit(limit)
+    ).all()
     
     return [
-        JobResponse(
-            job_id=job.job_id,
-            predicted_carbon_kg=job.predicted_carbon_kg,
-            region=job.region,
-            greenest_region=job.greenest_region,
-            potential_savings_kg=job.potential_savings_kg,
-            savings_percentage=(job.potential_savings_kg / job.predicted_carbon_kg * 100) if job.predicted_carbon_kg > 0 else 0,
-            carbon_by_region={},  # Not stored individually
-            timestamp=job.created_at
-        )
+        {
+            "job_id": job.job_id,
+            "predicted_carbon_kg": job.predicted_carbon_kg,
+            "region": job.region,
+            "greenest_region": job.greenest_region,
+            "potential_savings_kg": job.potential_savings_kg,
+            "savings_percentage": (job.potential_savings_kg / job.predicted_carbon_kg * 100) if job.predicted_carbon_kg > 0 else 0,
+            "carbon_by_region": {},  # Not stored individually
+            "timestamp": job.created_at
+        }
         for job in jobs
     ]
 
 @app.get("/stats", response_model=StatsResponse)
 def get_stats(db: Session = Depends(get_db)):
     """Get overall statistics"""
-    total_jobs = db.query(func.count(MLJob.id)).scalar()
-    total_carbon = db.query(func.sum(MLJob.predicted_carbon_kg)).scalar() or 0
-    total_savings = db.query(func.sum(MLJob.potential_savings_kg)).scalar() or 0
+    total_jobs, total_carbon, total_savings = db.execute(
+        select(
+            func.count(MLJob.id),
+            func.coalesce(func.sum(MLJob.predicted_carbon_kg), 0),
+            func.coalesce(func.sum(MLJob.potential_savings_kg), 0)
+        )
+    ).one()
     
     avg_savings_pct = (total_savings / total_carbon * 100) if total_carbon > 0 else 0
     
     # Jobs by region
-    jobs_by_region = {}
-    region_counts = db.query(MLJob.region, func.count(MLJob.id)).group_by(MLJob.region).all()
-    for region, count in region_counts:
-        jobs_by_region[region] = count
+    jobs_by_region = dict(
+        db.execute(select(MLJob.region, func.count(MLJob.id)).group_by(MLJob.region)).all()
+    )
     
     # Jobs by model
-    jobs_by_model = {}
-    model_counts = db.query(MLJob.model_type, func.count(MLJob.id)).group_by(MLJob.model_type).all()
-    for model, count in model_counts:
-        jobs_by_model[model] = count
+    jobs_by_model = dict(
+        db.execute(select(MLJob.model_type, func.count(MLJob.id)).group_by(MLJob.model_type)).all()
+    )
     
     return StatsResponse(
         total_jobs=total_jobs,
@@ -200,10 +228,16 @@ def get_stats(db: Session = Depends(get_db)):
         jobs_by_model=jobs_by_model
     )
 
+@app.get("/cache-stats")
+async def cache_stats():
+    """Get prediction cache statistics"""
+    return cache_info()
+
 @app.get("/health")
-def health():
-    return {"status": "healthy", "service": "GreenML Optimizer API"}
+async def health():
+    return Response(content=HEALTH_JSON, media_type="application/json")
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # "auto" picks uvloop where uvicorn[standard] installs it (not on Windows)
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop="auto", http="httptools")
\ No newline at end of file
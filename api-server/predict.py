@@ -1,56 +1,117 @@
 
 import joblib
-import pandas as pd
 import json
+from functools import lru_cache
 import numpy as np
 
-# Load model and encoders
-model = joblib.load('carbon_model.pkl')
-model_encoder = joblib.load('model_encoder.pkl')
-gpu_encoder = joblib.load('gpu_encoder.pkl')
-region_encoder = joblib.load('region_encoder.pkl')
-
 with open('region_carbon.json', 'r') as f:
     REGION_CARBON = json.load(f)
 
+# Region order for the batched region sweep
+REGIONS = list(REGION_CARBON)
+
+# Populated by load_models()
+model = model_encoder = gpu_encoder = region_encoder = None
+MODEL_IDX, GPU_IDX, REGION_IDX = {}, {}, {}
+_REGION_CODES = None
+
+def _require_models():
+    if model is None:
+        raise RuntimeError("models not loaded; call load_models()")
+
+def _encode(lookup, value, field):
+    try:
+        return lookup[value]
+    except KeyError:
+        raise ValueError(f"Unknown {field}: {value!r}") from None
+
 def predict_carbon(model_type, batch_size, dataset_size_gb, gpu_count, gpu_type, duration_hours, region):
     """
-    Predict carbon emissions for an ML job
+    Predict carbon emissions for an ML job in a single region
+
+    Used by scripts; the API goes through find_greenest_region, which
+    predicts every region at once.
     """
+    _require_models()
+
     # Encode categorical variables
-    model_encoded = model_encoder.transform([model_type])[0]
-    gpu_encoded = gpu_encoder.transform([gpu_type])[0]
-    region_encoded = region_encoder.transform([region])[0]
-
-    # Create input dataframe
-    input_data = pd.DataFrame([{
-        'model_type_encoded': model_encoded,
-        'batch_size': batch_size,
-        'dataset_size_gb': dataset_size_gb,
-        'gpu_count': gpu_count,
-        'gpu_type_encoded': gpu_encoded,
-        'duration_hours': duration_hours,
-        'region_encoded': region_encoded
-    }])
+    model_encoded = _encode(MODEL_IDX, model_type, 'model_type')
+    gpu_encoded = _encode(GPU_IDX, gpu_type, 'gpu_type')
+    region_encoded = _encode(REGION_IDX, region, 'region')
+
+    # Input row (column order matches feature_names.json)
+    row = np.array([[model_encoded, batch_size, dataset_size_gb, gpu_count,
+                     gpu_encoded, duration_hours, region_encoded]], dtype=np.float32)
 
     # Predict
-    prediction = model.predict(input_data)[0]
+    prediction = model.predict(row)[0]
 
     return float(prediction)
 
+@lru_cache(maxsize=8192)
+def _predict_all_regions(model_type, batch_size, dataset_size_gb, gpu_count, gpu_type, duration_hours):
+    """
+    Predict carbon for this job in every region, in REGIONS order
+    """
+    _require_models()
+
+    model_encoded = _encode(MODEL_IDX, model_type, 'model_type')
+    gpu_encoded = _encode(GPU_IDX, gpu_type, 'gpu_type')
+
+    # One row per region; only the region column differs
+    X = np.empty((len(REGIONS), 7), dtype=np.float32)
+    X[:, :6] = (model_encoded, batch_size, dataset_size_gb, gpu_count,
+                gpu_encoded, duration_hours)
+    X[:, 6] = _REGION_CODES
+
+    preds = model.predict(X)
+    return REGIONS[int(preds.argmin())], tuple(preds.tolist())
+
 def find_greenest_region(model_type, batch_size, dataset_size_gb, gpu_count, gpu_type, duration_hours):
     """
     Find the greenest region for this job
     """
-    results = {}
-    for region in REGION_CARBON.keys():
-        carbon = predict_carbon(model_type, batch_size, dataset_size_gb, gpu_count, gpu_type, duration_hours, region)
-        results[region] = carbon
+    greenest, preds = _predict_all_regions(model_type, batch_size, dataset_size_gb, gpu_count, gpu_type, duration_hours)
+    return greenest, dict(zip(REGIONS, preds))
+
+def cache_info():
+    """
+    Hit/miss counters for the region-sweep cache that serves /predict
+    """
+    return {
+        "find_greenest_region": _predict_all_regions.cache_info()._asdict()
+    }
+
+def load_models():
+    """
+    Load and warm up the model and encoders, and drop any cached predictions
+    """
+    global model, model_encoder, gpu_encoder, region_encoder
+    global MODEL_IDX, GPU_IDX, REGION_IDX, _REGION_CODES
+
+    model = joblib.load('carbon_model.pkl')
+    model_encoder = joblib.load('model_encoder.pkl')
+    gpu_encoder = joblib.load('gpu_encoder.pkl')
+    region_encoder = joblib.load('region_encoder.pkl')
+
+    # The model was fit on a DataFrame; we feed it plain arrays in the same
+    # column order (see feature_names.json), so drop the names it checks against.
+    if hasattr(model, 'feature_names_in_'):
+        del model.feature_names_in_
+
+    # Label -> code lookups, so requests don't go through LabelEncoder.transform
+    MODEL_IDX = {label: i for i, label in enumerate(model_encoder.classes_)}
+    GPU_IDX = {label: i for i, label in enumerate(gpu_encoder.classes_)}
+    REGION_IDX = {label: i for i, label in enumerate(region_encoder.classes_)}
+    _REGION_CODES = np.array([REGION_IDX[r] for r in REGIONS], dtype=np.float32)
+
+    # Warm up so the first request doesn't pay sklearn's first-call cost
+    model.predict(np.zeros((len(REGIONS), 7), dtype=np.float32))
 
-    greenest = min(results, key=results.get)
-    return greenest, results
+    _predict_all_regions.cache_clear()
 
 if __name__ == "__main__":
     # Test
+    load_models()
     result = predict_carbon('ResNet50', 32, 100, 2, 'V100', 4.0, 'us-east-1')
     print(f"Predicted carbon: {result:.2f} kg CO2")
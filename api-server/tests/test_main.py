@@ -0,0 +1,113 @@
+import importlib.util
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+API_DIR = Path(__file__).resolve().parents[1]
+MODEL_DIR = API_DIR.parent / "ml-model"
+
+JOB = {
+    "model_type": "GPT-2",
+    "batch_size": 64,
+    "dataset_size_gb": 500,
+    "gpu_count": 4,
+    "gpu_type": "A100",
+    "duration_hours": 12.5,
+    "region": "ap-south-1"
+}
+
+@pytest.fixture(scope="module")
+def workdir(tmp_path_factory):
+    # The app loads its model files and SQLite database relative to the
+    # working directory, so run it from a scratch copy
+    path = tmp_path_factory.mktemp("api")
+    shutil.copy(API_DIR / "region_carbon.json", path)
+    for pkl in MODEL_DIR.glob("*.pkl"):
+        shutil.copy(pkl, path)
+
+    cwd = os.getcwd()
+    os.chdir(path)
+    sys.path.insert(0, str(API_DIR))
+    try:
+        yield path
+    finally:
+        sys.path.remove(str(API_DIR))
+        os.chdir(cwd)
+
+@pytest.fixture(scope="module")
+def client(workdir):
+    import main
+    with TestClient(main.app) as c:
+        yield c
+
+def test_predict_before_load_models_raises(workdir):
+    # Fresh copy of predict.py, separate from the one the app has loaded
+    spec = importlib.util.spec_from_file_location("predict_unloaded", API_DIR / "predict.py")
+    predict = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(predict)
+
+    with pytest.raises(RuntimeError, match="models not loaded"):
+        predict.find_greenest_region("GPT-2", 64, 500, 4, "A100", 12.5)
+    with pytest.raises(RuntimeError, match="models not loaded"):
+        predict.predict_carbon("GPT-2", 64, 500, 4, "A100", 12.5, "us-east-1")
+
+def test_predict_uses_region_sweep(client):
+    r = client.post("/predict", json=JOB)
+    assert r.status_code == 200
+    data = r.json()
+
+    by_region = data["carbon_by_region"]
+    assert data["predicted_carbon_kg"] == by_region[JOB["region"]]
+    assert data["greenest_region"] == min(by_region, key=by_region.get)
+    assert data["potential_savings_kg"] == pytest.approx(
+        by_region[JOB["region"]] - by_region[data["greenest_region"]], abs=1e-3)
+
+def test_predict_repeat_is_served_from_cache(client):
+    first = client.post("/predict", json=JOB).json()
+    before = client.get("/cache-stats").json()["find_greenest_region"]["hits"]
+    second = client.post("/predict", json=JOB).json()
+    after = client.get("/cache-stats").json()["find_greenest_region"]["hits"]
+
+    assert after == before + 1
+    assert second["carbon_by_region"] == first["carbon_by_region"]
+    assert second["job_id"] != first["job_id"]
+
+def test_predict_rejects_unknown_region(client):
+    r = client.post("/predict", json=dict(JOB, region="mars-1"))
+    assert r.status_code == 400
+    assert r.json()["detail"].startswith("Invalid region.")
+
+def test_jobs_and_stats_reflect_predictions(client):
+    job = client.post("/predict", json=dict(JOB, model_type="ResNet50")).json()
+
+    jobs = client.get("/jobs", params={"limit": 1}).json()
+    assert [j["job_id"] for j in jobs] == [job["job_id"]]
+
+    stats = client.get("/stats").json()
+    assert stats["total_jobs"] == sum(stats["jobs_by_region"].values())
+    assert stats["jobs_by_model"]["ResNet50"] >= 1
+
+def test_static_endpoints_match_json_response(client):
+    # Pre-encoded bodies must be byte-identical to what JSONResponse sends
+    assert client.get("/").content == (
+        b'{"message":"GreenML Optimizer API","version":"1.0.0","docs":"/docs",'
+        b'"endpoints":{"predict":"/predict","jobs":"/jobs","stats":"/stats","regions":"/regions"}}'
+    )
+    assert client.get("/health").content == b'{"status":"healthy","service":"GreenML Optimizer API"}'
+
+    regions = client.get("/regions")
+    assert regions.headers["content-type"] == "application/json"
+    assert regions.content == JSONResponse({
+        "regions": [
+            {"name": "us-east-1", "carbon_intensity": 0.45, "unit": "kg CO2/kWh"},
+            {"name": "us-west-2", "carbon_intensity": 0.25, "unit": "kg CO2/kWh"},
+            {"name": "eu-west-1", "carbon_intensity": 0.3, "unit": "kg CO2/kWh"},
+            {"name": "ap-south-1", "carbon_intensity": 0.7, "unit": "kg CO2/kWh"},
+            {"name": "ap-northeast-1", "carbon_intensity": 0.5, "unit": "kg CO2/kWh"}
+        ]
+    }).body